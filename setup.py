@@ -6,11 +6,30 @@
     PyScaffold helps you to put up the scaffold of your new Python project.
     Learn more under: https://pyscaffold.org/
 """
-from setuptools import setup
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    # The compiled event math is optional, partial_trueskill falls back to pure Python
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [
+            Extension(
+                "partial_trueskill._ext",
+                ["src/partial_trueskill/_ext.pyx"],
+                optional=True,
+            )
+        ]
+    )
 
 if __name__ == "__main__":
     try:
-        setup(use_scm_version={"version_scheme": "no-guess-dev"})
+        setup(
+            use_scm_version={"version_scheme": "no-guess-dev"},
+            ext_modules=ext_modules,
+        )
     except:  # noqa
         print(
             "\n\nAn error occurred while building the project, "
@@ -0,0 +1,24 @@
+"""
+Numerical core of ``standard_mean_update``/``standard_variance_update`` as plain float functions.
+"""
+import math
+
+_sqrt = math.sqrt
+
+
+def _mean_new(mean: float, variance: float, weight: float, direction: float, v: float, tau_sq: float, c: float) -> float:
+    return mean + (weight * direction) * (v * ((variance * variance + tau_sq) / c))
+
+
+def _variance_new(variance: float, weight: float, w: float, tau_sq: float, c_sq: float) -> float:
+    sum_sq = variance * variance + tau_sq
+    # abs might not be necessary since direction is determined in mean update specifically
+    # _sqrt raises ValueError (math domain error) if the new variance**2 went negative
+    return _sqrt(sum_sq * (1 - abs(weight) * w * sum_sq / c_sq))
+
+
+def _mean_and_variance_new(mean: float, variance: float, weight: float, direction: float, v: float, w: float,
+                           tau_sq: float, c: float, c_sq: float) -> tuple[float, float]:
+    sum_sq = variance * variance + tau_sq
+    new_mean = mean + (weight * direction) * (v * (sum_sq / c))
+    return new_mean, _sqrt(sum_sq * (1 - abs(weight) * w * sum_sq / c_sq))
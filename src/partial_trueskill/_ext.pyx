@@ -0,0 +1,53 @@
+# cython: boundscheck=False, wraparound=False, language_level=3
+"""
+Compiled version of the scalar math in ``Event.__init__`` (delta, c, z, v, w). It mirrors ``Event._delta`` through
+``Event._variance_scale`` branch for branch, ``domain`` falls back to those when this module is not built. Division keeps
+Python semantics (no ``cdivision``) so ``c == 0`` raises ``ZeroDivisionError`` here too.
+"""
+from libc.math cimport erf, erfc, exp, sqrt
+
+# 1 / sqrt(2 * pi) as a literal, MSVC only defines M_PI with _USE_MATH_DEFINES
+cdef double _INV_SQRT_2PI = 0.3989422804014327
+cdef double _INV_SQRT_2 = 1 / sqrt(2)
+cdef double _TAIL_Z = -1.0
+cdef double _CONTINUED_FRACTION_Z = -8.0
+cdef int _CONTINUED_FRACTION_DEPTH = 12
+cdef double _LOGISTIC_SCALE = 1.702
+
+
+cdef double _mean_scale(double z, bint logistic) nogil:
+    cdef double x, build, pdf, cdf
+    cdef int k
+    if z < _CONTINUED_FRACTION_Z:
+        x = -z
+        build = x
+        for k in range(_CONTINUED_FRACTION_DEPTH, 0, -1):
+            build = x + k / build
+        return build
+    pdf = _INV_SQRT_2PI * exp(-0.5 * z * z)
+    if z < _TAIL_Z:
+        cdf = 0.5 * erfc(-z * _INV_SQRT_2)
+    elif logistic:
+        return pdf * (1.0 + exp(-_LOGISTIC_SCALE * z))
+    else:
+        cdf = 0.5 * (1.0 + erf(z * _INV_SQRT_2))
+    return pdf / cdf
+
+
+def compute_event_scalars(double mean_w, double mean_l, double sigma_variance_w, double sigma_variance_l,
+                          double beta_count, double beta_sq, bint logistic):
+    """
+    :param mean_w: Mean of the winner
+    :param mean_l: Mean of the loser
+    :param sigma_variance_w: ``winner.sigma_variance_for_std_dev()``
+    :param sigma_variance_l: ``loser.sigma_variance_for_std_dev()``
+    :param beta_count: Beta count of winner and loser together
+    :param beta_sq: ``Parameters.beta_sq``
+    :param logistic: Whether ``Parameters.cdf_approx`` is ``'logistic'``
+    :return: ``(delta, c, z_factor, v, w)``
+    """
+    cdef double delta = mean_w - mean_l
+    cdef double c = sqrt(beta_count * beta_sq + sigma_variance_w + sigma_variance_l)
+    cdef double z = delta / c
+    cdef double v = _mean_scale(z, logistic)
+    return delta, c, z, v, v * (v + z)
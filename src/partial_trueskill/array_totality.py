@@ -0,0 +1,166 @@
+"""
+``ArrayTotality``, a ``RateableTotality`` stored as numpy columns. Requires numpy (part of the ``batch`` extra).
+"""
+import typing
+
+import numpy as np
+
+from partial_trueskill.domain import (
+    ConstantRating, Rating, SkillBasedRating, ratings_changed, standard_mean_and_variance_update, standard_mean_update,
+    standard_variance_update
+)
+
+
+class _ArrayRating(Rating):
+    """
+    View of one member of an ``ArrayTotality``, reads and writes go straight to its arrays.
+    """
+    __slots__ = ('_totality', '_index')
+
+    def __init__(self, totality: 'ArrayTotality', index: int):
+        self._totality = totality
+        self._index = index
+
+    @property
+    def mean(self): return float(self._totality._means[self._index])
+
+    @mean.setter
+    def mean(self, value): self._totality._means[self._index] = value
+
+    @property
+    def variance(self): return float(self._totality._variances[self._index])
+
+    @variance.setter
+    def variance(self, value): self._totality._variances[self._index] = value
+
+    @property
+    def beta_count(self): return int(self._totality._beta_counts[self._index])
+
+    @property
+    def is_set(self): return bool(self._totality._fixed[self._index])
+
+    def update_mean(self, event, won_or_lost: typing.Literal[1, -1, None] = None):
+        if self.is_set: return
+        self.mean = standard_mean_update(self, event, won_or_lost)
+        ratings_changed()
+
+    def update_variance(self, event):
+        if self.is_set: return
+        self.variance = standard_variance_update(self, event)
+        ratings_changed()
+
+    def update_both(self, event, won_or_lost: typing.Literal[1, -1, None] = None):
+        if self.is_set: return
+        self.mean, self.variance = standard_mean_and_variance_update(self, event, won_or_lost)
+        ratings_changed()
+
+    def clone(self) -> Rating:
+        """
+        Detached copy of the member, a ``ConstantRating`` for members without a beta count and a ``SkillBasedRating``
+        otherwise.
+        """
+        if self.beta_count == 0:
+            return ConstantRating(self.is_set, self.variance, self.mean)
+        return SkillBasedRating(self.mean, self.variance)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(mean={self.mean!r}, variance={self.variance!r}, beta_count={self.beta_count!r})'
+
+
+class ArrayTotality(Rating):
+    """
+    Same as ``RateableTotality`` but the members are stored as parallel arrays (means, variances, beta counts and whether
+    the member is a set ``ConstantRating``) so the aggregates and updates are single vectorized expressions. Members must
+    be flat ratings, nested totalities are not supported. Membership and ``is_set`` are read once on construction.
+    Unlike ``RateableTotality`` the members are snapshotted: the ``Rating`` objects passed in never see any update, read
+    the results back through ``ratings``.
+    """
+
+    def __init__(self, name: str, ratings: typing.Iterable[Rating]):
+        ratings = list(ratings)
+        for rating in ratings:
+            if hasattr(rating, 'ratings'):
+                raise TypeError(f'{type(self).__name__} cannot contain another totality: {rating!r}')
+        self.name = name
+        self._means = np.array([rating.mean for rating in ratings], dtype=np.float64)
+        self._variances = np.array([rating.variance for rating in ratings], dtype=np.float64)
+        self._beta_counts = np.array([rating.beta_count for rating in ratings], dtype=np.int64)
+        self._fixed = np.array([isinstance(rating, ConstantRating) and rating.is_set for rating in ratings], dtype=bool)
+        self._build_views()
+
+    def _build_views(self):
+        # Built once so the same view object is returned each time, `Event.direction_of_weight` compares by identity
+        self._views = tuple(_ArrayRating(self, i) for i in range(len(self._means)))
+
+    @property
+    def ratings(self) -> tuple[_ArrayRating, ...]:
+        """
+        Views of the members. Membership is fixed at construction, hence a tuple rather than a list to mutate.
+        """
+        return self._views
+
+    @property
+    def mean(self):
+        return float(self._means.sum())
+
+    @property
+    def beta_count(self):
+        return int(self._beta_counts.sum())
+
+    @property
+    def variance(self):
+        return float(self._variances.sum())
+
+    def sigma_variance_for_std_dev(self) -> float:
+        return float(np.dot(self._variances, self._variances))
+
+    @staticmethod
+    def _new_variance_sqr(event, sum_sq, free):
+        """
+        Raises ``ValueError`` like the scalar ``math.sqrt`` path would, instead of letting ``np.sqrt`` store NaN.
+        """
+        new_variance_sqr = sum_sq * (1 - (abs(event.weight) * event.w / event.c_sq) * sum_sq)
+        if (new_variance_sqr[free] < 0).any():
+            raise ValueError('math domain error')
+        return new_variance_sqr
+
+    def update_mean(self, event, won_or_lost=None):
+        if won_or_lost is None:
+            won_or_lost = event.direction_of_weight(self)
+        sum_sq = self._variances * self._variances + event.tau_sq
+        step = ((event.weight * won_or_lost) * event.v / event.c) * sum_sq
+        np.add(self._means, step, out=self._means, where=~self._fixed)
+        ratings_changed()
+
+    def update_variance(self, event):
+        free = ~self._fixed
+        sum_sq = self._variances * self._variances + event.tau_sq
+        new_variance_sqr = self._new_variance_sqr(event, sum_sq, free)
+        np.sqrt(new_variance_sqr, out=self._variances, where=free)
+        ratings_changed()
+
+    def update_both(self, event, won_or_lost=None):
+        if won_or_lost is None:
+            won_or_lost = event.direction_of_weight(self)
+        free = ~self._fixed
+        sum_sq = self._variances * self._variances + event.tau_sq
+        new_variance_sqr = self._new_variance_sqr(event, sum_sq, free)
+        np.add(self._means, ((event.weight * won_or_lost) * event.v / event.c) * sum_sq, out=self._means, where=free)
+        np.sqrt(new_variance_sqr, out=self._variances, where=free)
+        ratings_changed()
+
+    def clone(self) -> 'ArrayTotality':
+        new = ArrayTotality.__new__(ArrayTotality)
+        new.name = self.name
+        new._means = self._means.copy()
+        new._variances = self._variances.copy()
+        new._beta_counts = self._beta_counts.copy()
+        new._fixed = self._fixed.copy()
+        new._build_views()
+        return new
+
+    def __copy__(self):
+        return self.clone()
+
+    def __repr__(self):
+        return f'{type(self).__name__}(name={self.name!r}, ratings={self.ratings!r})'
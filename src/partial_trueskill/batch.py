@@ -0,0 +1,47 @@
+"""
+Vectorized version of ``Event`` + ``standard_mean_update``/``standard_variance_update`` for many independent matches at
+once (e.g. replaying a season). Requires the ``batch`` extra (numpy and scipy).
+
+As in ``domain``, the ``var_*`` arrays hold sigma, not sigma**2.
+"""
+import numpy as np
+from scipy import special
+
+_LOG_INV_SQRT_2PI = -0.5 * np.log(2 * np.pi)
+
+
+def batch_evaluate(mu_w, var_w, bc_w, mu_l, var_l, bc_l, weight, beta: float, tau: float):
+    """
+    Evaluates one event per element and returns the updated ratings of both sides. Arrays must broadcast together and
+    none of the inputs are modified. Where the new variance**2 goes negative (the scalar path raises ``ValueError``) the
+    returned sigma is NaN, check the output with ``np.isnan`` if that can happen.
+    :param mu_w: Means of the winners
+    :param var_w: Sigmas of the winners
+    :param bc_w: Beta counts of the winners
+    :param mu_l: Means of the losers
+    :param var_l: Sigmas of the losers
+    :param bc_l: Beta counts of the losers
+    :param weight: Weight of each event (MUST BE 0 < weight <= 1!)
+    :param beta: Same as ``Parameters.static_performance_spread``
+    :param tau: Same as ``Parameters.constant_additional_variance``
+    :return: ``(new_mu_w, new_var_w, new_mu_l, new_var_l)``
+    """
+    mu_w, var_w, bc_w, mu_l, var_l, bc_l, weight = (
+        np.asarray(a, dtype=np.float64) for a in (mu_w, var_w, bc_w, mu_l, var_l, bc_l, weight)
+    )
+    c_sq = (bc_w + bc_l) * (beta * beta) + var_w * var_w + var_l * var_l
+    c = np.sqrt(c_sq)
+    z = (mu_w - mu_l) / c
+    # pdf/cdf in log space so the tail (very negative z) does not turn into 0/0
+    v = np.exp(_LOG_INV_SQRT_2PI - 0.5 * z * z - special.log_ndtr(z))
+    w = v * (v + z)
+
+    tau_sq = tau * tau
+    sum_sq_w = var_w * var_w + tau_sq
+    sum_sq_l = var_l * var_l + tau_sq
+    new_mu_w = mu_w + weight * v * sum_sq_w / c
+    new_mu_l = mu_l - weight * v * sum_sq_l / c
+    scale = np.abs(weight) * w / c_sq
+    new_var_w = np.sqrt(sum_sq_w * (1 - scale * sum_sq_w))
+    new_var_l = np.sqrt(sum_sq_l * (1 - scale * sum_sq_l))
+    return new_mu_w, new_var_w, new_mu_l, new_var_l
@@ -1,12 +1,42 @@
-import abc
 import copy
-import inspect
 import math
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 import typing
-import statistics
 
-normal_dist = statistics.NormalDist()
+from partial_trueskill._core import _mean_and_variance_new, _mean_new, _variance_new
+
+try:
+    from partial_trueskill._ext import compute_event_scalars as _compute_event_scalars
+except ImportError:
+    _compute_event_scalars = None
+
+_INV_SQRT_2PI = 1 / math.sqrt(2 * math.pi)
+_INV_SQRT_2 = 1 / math.sqrt(2)
+# Bound once so the per-event math skips the `math` attribute lookup
+_sqrt = math.sqrt
+_exp = math.exp
+_erf = math.erf
+_erfc = math.erfc
+# Below this z the tail cdf is computed with erfc, below the next one `v` comes straight from the continued fraction.
+_TAIL_Z = -1.0
+_CONTINUED_FRACTION_Z = -8.0
+_CONTINUED_FRACTION_DEPTH = 12
+# Phi(x) ~= 1 / (1 + exp(-1.702 x)), used by ``Parameters(cdf_approx='logistic')``
+_LOGISTIC_SCALE = 1.702
+
+# Bumped by every rating update so a ``RateableTotality`` can tell in O(1) whether its cached aggregates may be stale,
+# including when a child was updated outside of it (e.g. a team member playing a 1v1).
+_generation = 0
+
+
+def ratings_changed():
+    """
+    Marks every ``RateableTotality`` cache as possibly stale. Called by every rating update, ``Rating`` subclasses outside
+    this module must call it too after changing ``mean`` or ``variance``.
+    """
+    global _generation
+    _generation += 1
 
 
 @dataclass(frozen=True)
@@ -15,9 +45,21 @@ class Parameters:
     Parameters beta and tau to use for any specific event. These parameters are immutable.
     `static_performance_spread = beta`
     `constant_additional_variance = tau`
+    `beta_sq` and `tau_sq` are precomputed since every event and update needs them.
+    `cdf_approx` picks how `v` gets the normal cdf for z >= -1, ``'exact'`` (erf) or ``'logistic'``
+    (``1/(1 + exp(-1.702z))``, within 1e-2 of the cdf, `v` up to ~3% off).
     """
     static_performance_spread: float
     constant_additional_variance: float
+    cdf_approx: typing.Literal['exact', 'logistic'] = 'exact'
+    beta_sq: float = field(init=False, repr=False, compare=False)
+    tau_sq: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.cdf_approx not in ('exact', 'logistic'):
+            raise ValueError(f"cdf_approx must be 'exact' or 'logistic', got {self.cdf_approx!r}")
+        object.__setattr__(self, 'beta_sq', self.static_performance_spread * self.static_performance_spread)
+        object.__setattr__(self, 'tau_sq', self.constant_additional_variance * self.constant_additional_variance)
 
     @property
     def beta(self): return self.static_performance_spread
@@ -27,31 +69,45 @@ class Parameters:
 
 
 # noinspection PyStatementEffect
-class Rating(abc.ABC):
+class Rating:
     mean: float
     variance: float
     beta_count: int
 
     def sigma_variance_for_std_dev(self) -> float:
-        return self.variance ** 2
+        """
+        ``variance`` holds sigma (it is square rooted in `standard_variance_update`), so this is the sigma**2 term of `c`.
+        """
+        return self.variance * self.variance
 
     def update_mean_and_variance(self, event: 'Event'):
         """
-        This order is required because the old variance is used in both calculations whereas the old mean is only used in `update_mean`.
+        Same as ``update_both`` with the direction taken from the event. Both updates use the old variance.
         """
-        self.update_mean(event)
+        self.update_both(event)
+
+    def update_both(self, event: 'Event', won_or_lost: typing.Literal[1, -1, None] = None):
+        """
+        Updates mean and variance from the same old variance. Subclasses override this to do both in a single pass.
+        """
+        self.update_mean(event, won_or_lost)
         self.update_variance(event)
 
-    @abc.abstractmethod
+    def clone(self) -> 'Rating':
+        """
+        Returns an independent copy. Subclasses override this with a direct constructor call, this fallback goes through
+        ``copy.copy``.
+        """
+        return copy.copy(self)
+
     def update_mean(self, event: 'Event', won_or_lost: typing.Literal[1, -1, None] = None):
-        ...
+        raise NotImplementedError
 
-    @abc.abstractmethod
     def update_variance(self, event: 'Event'):
-        ...
+        raise NotImplementedError
 
 
-@dataclass
+@dataclass(eq=False)
 class ConstantRating(Rating):
     is_set: bool
     variance: float
@@ -61,13 +117,23 @@ class ConstantRating(Rating):
     def update_mean(self, event, won_or_lost: typing.Literal[1, -1, None] = None):
         if self.is_set: return
         self.mean = standard_mean_update(self, event, won_or_lost)
+        ratings_changed()
 
     def update_variance(self, event):
         if self.is_set: return
         self.variance = standard_variance_update(self, event)
+        ratings_changed()
 
+    def update_both(self, event, won_or_lost: typing.Literal[1, -1, None] = None):
+        if self.is_set: return
+        self.mean, self.variance = standard_mean_and_variance_update(self, event, won_or_lost)
+        ratings_changed()
 
-@dataclass
+    def clone(self) -> 'ConstantRating':
+        return type(self)(self.is_set, self.variance, self.mean)
+
+
+@dataclass(eq=False)
 class SkillBasedRating(Rating):
     mean: float
     variance: float
@@ -75,34 +141,73 @@ class SkillBasedRating(Rating):
 
     def update_mean(self, event, won_or_lost: typing.Literal[1, -1, None] = None):
         self.mean = standard_mean_update(self, event, won_or_lost)
+        ratings_changed()
 
     def update_variance(self, event):
         self.variance = standard_variance_update(self, event)
+        ratings_changed()
+
+    def update_both(self, event, won_or_lost: typing.Literal[1, -1, None] = None):
+        self.mean, self.variance = standard_mean_and_variance_update(self, event, won_or_lost)
+        ratings_changed()
 
+    def clone(self) -> 'SkillBasedRating':
+        return type(self)(self.mean, self.variance)
 
-@dataclass
+
+@dataclass(eq=False)
 class RateableTotality(Rating):
+    """
+    Sum of its ratings. The aggregates are cached and recomputed once any rating has been updated since, wherever that
+    update happened.
+    IF YOU CHANGE ``ratings`` OR ASSIGN A CHILD'S ``mean``/``variance`` BY HAND call ``invalidate`` so the aggregates are
+    recomputed.
+    """
     name: str
     ratings: list[Rating]
 
+    def __post_init__(self):
+        self.invalidate()
+
+    def invalidate(self):
+        self._refreshed_at = -1
+
+    def _refresh(self):
+        mean = variance = sigma_variance = 0.0
+        beta_count = 0
+        for rating in self.ratings:
+            mean += rating.mean
+            variance += rating.variance
+            beta_count += rating.beta_count
+            sigma_variance += rating.sigma_variance_for_std_dev()
+        self._mean_cache = mean
+        self._var_cache = variance
+        self._bc_cache = beta_count
+        self._sv_cache = sigma_variance
+        self._refreshed_at = _generation
+
     @property
     def mean(self):
-        return sum([rating.mean for rating in self.ratings])
+        if self._refreshed_at != _generation: self._refresh()
+        return self._mean_cache
 
     @property
     def beta_count(self):
-        return sum([rating.beta_count for rating in self.ratings])
+        if self._refreshed_at != _generation: self._refresh()
+        return self._bc_cache
 
     @property
     def variance(self):
-        return sum([rating.variance for rating in self.ratings])
+        if self._refreshed_at != _generation: self._refresh()
+        return self._var_cache
 
-    @typing.override
     def sigma_variance_for_std_dev(self) -> float:
-        return sum([rating.sigma_variance_for_std_dev() for rating in self.ratings])
+        if self._refreshed_at != _generation: self._refresh()
+        return self._sv_cache
 
     def update_mean(self, event, won_or_lost=None):
-        won_or_lost = event.direction_of_weight(self)
+        if won_or_lost is None:
+            won_or_lost = event.direction_of_weight(self)
         for rating in self.ratings:
             rating.update_mean(event, won_or_lost)
 
@@ -110,45 +215,67 @@ class RateableTotality(Rating):
         for rating in self.ratings:
             rating.update_variance(event)
 
-    def __copy__(self):
+    def update_both(self, event, won_or_lost=None):
+        if won_or_lost is None:
+            won_or_lost = event.direction_of_weight(self)
+        for rating in self.ratings:
+            rating.update_both(event, won_or_lost)
+
+    def clone(self) -> 'RateableTotality':
         # Warning: Ratings cannot contain themselves
-        return RateableTotality(self.name, [copy.copy(rating) for rating in self.ratings])
+        return RateableTotality(self.name, [rating.clone() for rating in self.ratings])
+
+    def __copy__(self):
+        return self.clone()
 
 
-@dataclass
 class Event:
     """
     The idea of an event is that it takes a winner and a loser which it calculates all the necessary variables given the weight
     for the ratings to update themselves. The ``weight`` param MUST BE 0 < weight <= 1! Events also have a name so that you can
     identify them if need be.
 
-    Once instantiated the properties derived off the initial parameters are immutable.
+    The derived quantities (``delta``, ``c``, ``c_sq``, ``tau_sq``, ``z_factor``, ``v``, ``w``) are plain slots computed once
+    in ``__init__`` so the update functions read them without going through a descriptor. When the compiled ``_ext`` module
+    is built they come from it in one call, otherwise from the ``_delta`` ... ``_variance_scale`` methods below.
     IF YOU CHANGE ANY OF THE ATTRIBUTES THE CALCULATIONS WILL NOT UPDATE! In this case it's better to instantiate a new
     object using ``copy_with``.
     """
-    weight: float  # MUST BE 0 < weight <= 1!
-    winner: Rating
-    loser: Rating
-    parameters: Parameters
-    name: str = ''
+    __slots__ = ('weight', 'winner', 'loser', 'parameters', 'name', 'delta', 'c', 'c_sq', 'tau_sq', 'z_factor', 'v', 'w')
 
-    def __post_init__(self):
+    def __init__(self, weight: float, winner: Rating, loser: Rating, parameters: Parameters, name: str = ''):
         """
         Done based in the format of non-dependent variables first and then using those to build subsequent variables.
         """
-        self.__delta = self._delta()
-        self.__std_dev_of_performances = self._std_dev_of_performances()
-        self.__z_factor = self._z_factor()
-        self.__mean_scale = self._mean_scale()
-        self.__variance_scale = self._variance_scale()
+        self.weight = weight  # MUST BE 0 < weight <= 1!
+        self.winner = winner
+        self.loser = loser
+        self.parameters = parameters
+        self.name = name
+
+        self.tau_sq = parameters.tau_sq
+        if _compute_event_scalars is not None:  # pragma: no cover (only when _ext is built)
+            self.delta, self.c, self.z_factor, self.v, self.w = _compute_event_scalars(
+                winner.mean, loser.mean, winner.sigma_variance_for_std_dev(), loser.sigma_variance_for_std_dev(),
+                winner.beta_count + loser.beta_count, parameters.beta_sq, parameters.cdf_approx == 'logistic'
+            )
+            self.c_sq = self.c * self.c
+            return
+        self.delta = self._delta()
+        self.c = self._std_dev_of_performances()
+        self.c_sq = self.c * self.c
+        self.z_factor = self._z_factor()
+        self.v = self._mean_scale()
+        self.w = self._variance_scale()
+
+    def __repr__(self):
+        return (f'{type(self).__name__}(weight={self.weight!r}, winner={self.winner!r}, loser={self.loser!r}, '
+                f'parameters={self.parameters!r}, name={self.name!r})')
 
     # <editor-fold desc="Delta">
     def _delta(self) -> float:
         return self.winner.mean - self.loser.mean
 
-    @property
-    def delta(self): return self.__delta
-
     # </editor-fold>
 
     # <editor-fold desc="C">
@@ -156,40 +283,54 @@ class Event:
         """
         Takes formula for `c` at the end of pg12
         """
-        return math.sqrt(
-            ((self.winner.beta_count + self.loser.beta_count) * self.parameters.static_performance_spread ** 2)
+        return _sqrt(
+            ((self.winner.beta_count + self.loser.beta_count) * self.parameters.beta_sq)
             + self.winner.sigma_variance_for_std_dev() + self.loser.sigma_variance_for_std_dev()
         )
 
     @property
-    def std_dev_of_performances(self): return self.__std_dev_of_performances
-
-    @property
-    def c(self): return self.__std_dev_of_performances
+    def std_dev_of_performances(self): return self.c
 
     # </editor-fold>
 
     # <editor-fold desc="Z Factor">
     def _z_factor(self) -> float:
-        return self.delta / self.std_dev_of_performances
-
-    @property
-    def z_factor(self): return self.__z_factor
+        return self.delta / self.c
 
     # </editor-fold>
 
     # <editor-fold desc="V">
     def _mean_scale(self) -> float:
         """
-        Formula for `v` pg4
-        """
-        return normal_dist.pdf(self.z_factor) / normal_dist.cdf(self.z_factor)
+        Formula for `v` pg4. The standard normal pdf and cdf are inlined (mu=0, sigma=1) instead of going through
+        ``statistics.NormalDist``.
 
-    @property
-    def mean_scale(self): return self.__mean_scale
+        For a very negative z both pdf and cdf vanish, so `v` (the inverse Mills ratio) is evaluated directly from its
+        continued fraction ``-z + 1/(-z + 2/(-z + 3/(-z + ...)))``, which only needs arithmetic. In between, the cdf is
+        computed with ``erfc`` to avoid the cancellation in ``1 + erf(z/sqrt(2))``.
+
+        With ``cdf_approx='logistic'`` the cdf above the tail is ``1/(1 + exp(-1.702z))``, so ``v = pdf * (1 + exp(-1.702z))``
+        with a second exp in place of erf. The tail keeps the exact paths since the logistic cdf is far too heavy there
+        (at z=-3 `v` would come out ~4x too small).
+        """
+        z = self.z_factor
+        if z < _CONTINUED_FRACTION_Z:
+            x = -z
+            build = x
+            for k in range(_CONTINUED_FRACTION_DEPTH, 0, -1):
+                build = x + k / build
+            return build
+        pdf = _INV_SQRT_2PI * _exp(-0.5 * z * z)
+        if z < _TAIL_Z:
+            cdf = 0.5 * _erfc(-z * _INV_SQRT_2)
+        elif self.parameters.cdf_approx == 'logistic':
+            return pdf * (1.0 + _exp(-_LOGISTIC_SCALE * z))
+        else:
+            cdf = 0.5 * (1.0 + _erf(z * _INV_SQRT_2))
+        return pdf / cdf
 
     @property
-    def v(self): return self.__mean_scale
+    def mean_scale(self): return self.v
 
     # </editor-fold>
 
@@ -201,22 +342,18 @@ class Event:
         return self.v * (self.v + self.z_factor)
 
     @property
-    def variance_scale(self): return self.__variance_scale
-
-    @property
-    def w(self): return self.__variance_scale
+    def variance_scale(self): return self.w
 
     # </editor-fold>
 
     def direction_of_weight(self, rating: Rating) -> typing.Literal[1, -1]:
         """
-        Returns the direction of the weight to determine whether the rating should go up or down.
+        Returns the direction of the weight to determine whether the rating should go up or down. Compared by identity, so
+        a rating equal to but not the same object as the winner counts as the loser.
         :param rating: Rating object to be determined whether won or lost
         :return: 1 or -1
         """
-        if rating == self.winner:
-            return 1
-        return -1
+        return 1 if rating is self.winner else -1
 
     def copy_with(self, weight=None, winner=None, loser=None, parameters=None, name=None):
         return Event(
@@ -230,7 +367,7 @@ class Event:
 
 def standard_mean_update(rating: Rating, event: Event, won_or_lost: typing.Literal[1, -1, None] = None) -> float:
     """
-    Uses formula from pg11 `mu_new`. This function does not modify any objects passed by reference.
+    Uses formula from pg11 `mu_new` (computed in ``_core``). This function does not modify any objects passed by reference.
     :param rating: Rating to update (not in place returns new mean as float)
     :param event: The event which the rating object played which will change its rating
     :param won_or_lost: Whether the rating object won or lost (MUST BE `1, -1 or None`)
@@ -238,29 +375,36 @@ def standard_mean_update(rating: Rating, event: Event, won_or_lost: typing.Liter
     """
     if won_or_lost is None:
         won_or_lost = event.direction_of_weight(rating)
-    new_mean = rating.mean + (event.weight * won_or_lost) * (event.mean_scale * (
-            (rating.variance ** 2 + event.parameters.tau ** 2) / event.std_dev_of_performances)
-                                                             )
-    return new_mean
+    return _mean_new(rating.mean, rating.variance, event.weight, won_or_lost, event.v, event.tau_sq, event.c)
 
 
 def standard_variance_update(rating: Rating, event: Event) -> float:
     """
-    Uses formula from pg11 `sigma_new**2` except since we want sigma and not sigma**2, we also take the sqrt of the final
-    answer. This function does not modify any objects passed by reference.
+    Uses formula from pg11 `sigma_new**2` (computed in ``_core``) except since we want sigma and not sigma**2, we also take
+    the sqrt of the final answer. This function does not modify any objects passed by reference.
     :param rating: Rating object to return new variance from
     :param event: Event from which the variance should be updated
     :return: Result of new variance
     """
-    tau_sqr = event.parameters.constant_additional_variance ** 2
-    variance_sqr = rating.variance ** 2
-    new_variance_sqr = (variance_sqr + tau_sqr) * (1 - abs(event.weight) * (
-        # abs might not be necessary since direction is determined in mean update specifically
-            event.variance_scale * (
-            (variance_sqr + tau_sqr) / event.std_dev_of_performances ** 2)
-    ))
-    return math.sqrt(new_variance_sqr)
+    return _variance_new(rating.variance, event.weight, event.w, event.tau_sq, event.c_sq)
+
+
+def standard_mean_and_variance_update(rating: Rating, event: Event, won_or_lost: typing.Literal[1, -1, None] = None) \
+        -> tuple[float, float]:
+    """
+    `standard_mean_update` and `standard_variance_update` fused so ``variance**2 + tau**2`` is only computed once. This
+    function does not modify any objects passed by reference.
+    :param rating: Rating to update (not in place returns new mean and variance as floats)
+    :param event: The event which the rating object played which will change its rating
+    :param won_or_lost: Whether the rating object won or lost (MUST BE `1, -1 or None`)
+    :return: New mean and new variance for rating
+    """
+    if won_or_lost is None:
+        won_or_lost = event.direction_of_weight(rating)
+    return _mean_and_variance_new(
+        rating.mean, rating.variance, event.weight, won_or_lost, event.v, event.w, event.tau_sq, event.c, event.c_sq
+    )
 
 
 def name_of_func_in_scope():
-    return inspect.stack()[1][3]
+    return sys._getframe(1).f_code.co_name
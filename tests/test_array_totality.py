@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from partial_trueskill.array_totality import ArrayTotality  # noqa: E402
+from partial_trueskill.domain import (  # noqa: E402
+    ConstantRating, Event, Parameters, RateableTotality, SkillBasedRating
+)
+
+
+def make_team(rng):
+    return [SkillBasedRating(rng.uniform(0, 30), rng.uniform(1, 8)) for _ in range(4)] + [
+        ConstantRating(True, 1.0, 3.0),
+        ConstantRating(False, 2.0, 4.0),
+    ]
+
+
+def assert_same_totals(totality, array_totality):
+    assert array_totality.mean == pytest.approx(totality.mean, rel=1e-12)
+    assert array_totality.variance == pytest.approx(totality.variance, rel=1e-12)
+    assert array_totality.beta_count == totality.beta_count
+    assert array_totality.sigma_variance_for_std_dev() == pytest.approx(totality.sigma_variance_for_std_dev(), rel=1e-12)
+    for rating, view in zip(totality.ratings, array_totality.ratings):
+        assert view.mean == pytest.approx(rating.mean, rel=1e-12)
+        assert view.variance == pytest.approx(rating.variance, rel=1e-12)
+
+
+def test_array_totality_matches_rateable_totality():
+    rng = random.Random(3)
+    parameters = Parameters(4.1, 0.08)
+    a, b = make_team(rng), make_team(rng)
+    totalities = RateableTotality('a', [r.clone() for r in a]), RateableTotality('b', [r.clone() for r in b])
+    arrays = ArrayTotality('a', a), ArrayTotality('b', b)
+    assert_same_totals(totalities[0], arrays[0])
+    for i in range(20):
+        for first, second in (totalities, arrays):
+            winner, loser = (first, second) if i % 3 else (second, first)
+            event = Event(0.7, winner, loser, parameters)
+            winner.update_mean_and_variance(event)
+            loser.update_mean_and_variance(event)
+    for totality, array_totality in zip(totalities, arrays):
+        assert_same_totals(totality, array_totality)
+        assert array_totality.ratings[4].mean == 3.0
+        assert array_totality.ratings[4].variance == 1.0
+
+
+def test_array_totality_membership_is_fixed():
+    array_totality = ArrayTotality('a', [SkillBasedRating(1.0, 1.0)])
+    assert isinstance(array_totality.ratings, tuple)
+    with pytest.raises(TypeError):
+        ArrayTotality('nested', [RateableTotality('inner', [SkillBasedRating(1.0, 1.0)])])
+
+
+@pytest.mark.parametrize('method', ['update_mean', 'update_variance', 'update_both'])
+def test_array_totality_vectorized_updates_match_members(method):
+    rng = random.Random(7)
+    parameters = Parameters(4.1, 0.08)
+    a, b = make_team(rng), make_team(rng)
+    totality = RateableTotality('a', [r.clone() for r in a])
+    array_totality = ArrayTotality('a', a)
+    opponent = RateableTotality('b', b)
+    for won in (True, False):
+        event = Event(0.6, totality, opponent, parameters) if won else Event(0.6, opponent, totality, parameters)
+        array_event = event.copy_with(winner=array_totality) if won else event.copy_with(loser=array_totality)
+        getattr(totality, method)(event)
+        getattr(array_totality, method)(array_event)
+        assert_same_totals(totality, array_totality)
+    assert array_totality.ratings[4].mean == 3.0
+    assert array_totality.ratings[4].variance == 1.0
+
+
+def test_array_totality_member_can_play_on_its_own():
+    array_totality = ArrayTotality('a', [SkillBasedRating(25.0, 8.0), SkillBasedRating(25.0, 8.0)])
+    assert array_totality.ratings is array_totality.ratings
+    opponent = SkillBasedRating(25.0, 8.0)
+    event = Event(1.0, array_totality.ratings[0], opponent, Parameters(4.1, 0.08))
+    array_totality.ratings[0].update_mean_and_variance(event)
+    assert array_totality.ratings[0].mean > 25.0
+    assert array_totality.clone().ratings[0]._totality is not array_totality
+
+
+def test_array_totality_snapshots_members():
+    alice = SkillBasedRating(25.0, 8.0)
+    array_totality = ArrayTotality('a', [alice])
+    event = Event(1.0, array_totality, SkillBasedRating(25.0, 8.0), Parameters(4.1, 0.08))
+    array_totality.update_mean_and_variance(event)
+    assert alice.mean == 25.0
+    assert array_totality.ratings[0].mean > 25.0
+
+
+def test_array_member_clone_is_detached():
+    array_totality = ArrayTotality('a', [SkillBasedRating(25.0, 8.0), ConstantRating(True, 1.0, 3.0)])
+    clone = RateableTotality('r', list(array_totality.ratings)).clone()
+    clone.ratings[0].mean = 99.0
+    assert array_totality.ratings[0].mean == 25.0
+    assert type(clone.ratings[0]) is SkillBasedRating
+    assert type(clone.ratings[1]) is ConstantRating and clone.ratings[1].is_set
+
+
+@pytest.mark.parametrize('method', ['update_variance', 'update_both'])
+def test_array_totality_negative_new_variance_raises(method):
+    winner = ArrayTotality('w', [ConstantRating(False, 1.0, 0.0)])
+    loser = ConstantRating(False, 1.0, 5.0)
+    event = Event(1.0, winner, loser, Parameters(1.0, 3.0))
+    with pytest.raises(ValueError):
+        getattr(winner, method)(event)
+    assert (winner.ratings[0].mean, winner.ratings[0].variance) == (0.0, 1.0)
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+
+from partial_trueskill.batch import batch_evaluate  # noqa: E402
+from partial_trueskill.domain import Event, Parameters, SkillBasedRating  # noqa: E402
+
+
+def test_batch_evaluate_matches_scalar_updates():
+    rng = random.Random(0)
+    parameters = Parameters(4.1, 0.08)
+    inputs, expected = [], []
+    for _ in range(2000):
+        winner = SkillBasedRating(rng.uniform(-60, 60), rng.uniform(0.5, 9))
+        loser = SkillBasedRating(rng.uniform(-60, 60), rng.uniform(0.5, 9))
+        weight = rng.uniform(0.1, 1)
+        inputs.append((winner.mean, winner.variance, 1, loser.mean, loser.variance, 1, weight))
+        event = Event(weight, winner, loser, parameters)
+        winner.update_mean_and_variance(event)
+        loser.update_mean_and_variance(event)
+        expected.append((winner.mean, winner.variance, loser.mean, loser.variance))
+
+    result = batch_evaluate(*zip(*inputs), beta=4.1, tau=0.08)
+    # 1 - w * sigma**2 / c**2 cancels on big upsets, which amplifies last-bit differences in v
+    np.testing.assert_allclose(np.array(result).T, np.array(expected), rtol=1e-10)
+
+
+def test_batch_evaluate_does_not_modify_inputs():
+    mu_w = np.array([30.0, 10.0])
+    before = mu_w.copy()
+    batch_evaluate(mu_w, [8.0, 8.0], [1, 1], [20.0, 20.0], [8.0, 8.0], [1, 1], [1.0, 1.0], beta=4.1, tau=0.08)
+    np.testing.assert_array_equal(mu_w, before)
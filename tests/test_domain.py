@@ -0,0 +1,118 @@
+import copy
+import math
+
+import pytest
+
+from partial_trueskill import domain
+from partial_trueskill.domain import ConstantRating, Event, Parameters, RateableTotality, SkillBasedRating
+
+
+def reference_v(z):
+    """pdf/cdf of the standard normal with the cdf taken from erfc so the tail does not cancel"""
+    pdf = math.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+    cdf = 0.5 * math.erfc(-z / math.sqrt(2))
+    return pdf / cdf
+
+
+def mean_scale_at(z, cdf_approx='exact'):
+    event = Event(1.0, SkillBasedRating(0.0, 1.0), SkillBasedRating(0.0, 1.0), Parameters(1.0, 0.0, cdf_approx))
+    event.z_factor = z
+    return event._mean_scale()
+
+
+def test_mean_scale_matches_reference():
+    for i in range(-3700, 501):
+        z = i / 100
+        assert mean_scale_at(z) == pytest.approx(reference_v(z), rel=1e-12, abs=0), z
+
+
+@pytest.mark.parametrize('boundary', [domain._CONTINUED_FRACTION_Z, domain._TAIL_Z])
+def test_mean_scale_is_continuous_across_branches(boundary):
+    below = mean_scale_at(math.nextafter(boundary, -math.inf))
+    at = mean_scale_at(boundary)
+    assert below == pytest.approx(at, rel=1e-12, abs=0)
+
+
+def test_totality_sees_child_updated_outside_of_it():
+    p = Parameters(4.1, 0.08)
+    alice = SkillBasedRating(25.0, 8.0)
+    team = RateableTotality('team', [alice, SkillBasedRating(25.0, 8.0)])
+    assert team.mean == 50.0
+    alice.update_mean_and_variance(Event(1.0, alice, SkillBasedRating(25.0, 8.0), p))
+    assert alice.mean > 25.0
+    assert team.mean == alice.mean + 25.0
+    assert team.variance == alice.variance + 8.0
+    assert team.sigma_variance_for_std_dev() == alice.variance ** 2 + 64.0
+
+
+def test_invalidate_after_manual_edit():
+    alice = SkillBasedRating(25.0, 8.0)
+    team = RateableTotality('team', [alice])
+    assert team.mean == 25.0
+    team.ratings.append(SkillBasedRating(10.0, 1.0))
+    team.invalidate()
+    assert team.mean == 35.0
+
+
+def test_negative_new_variance_raises():
+    winner = ConstantRating(False, 1.0, 0.0)
+    loser = ConstantRating(False, 1.0, 5.0)
+    event = Event(1.0, winner, loser, Parameters(1.0, 3.0))
+    with pytest.raises(ValueError):
+        winner.update_mean_and_variance(event)
+
+
+def test_nested_totality_follows_outer_direction():
+    inner = RateableTotality('inner', [SkillBasedRating(20.0, 8.0)])
+    winner = RateableTotality('winner', [SkillBasedRating(20.0, 8.0), inner])
+    loser = RateableTotality('loser', [SkillBasedRating(25.0, 8.0), SkillBasedRating(25.0, 8.0)])
+    event = Event(1.0, winner, loser, Parameters(4.1, 0.08))
+    winner.update_mean_and_variance(event)
+    loser.update_mean_and_variance(event)
+    assert inner.mean > 20.0
+    assert inner.ratings[0].mean == winner.ratings[0].mean
+    assert all(rating.mean < 25.0 for rating in loser.ratings)
+
+
+def test_unknown_cdf_approx_raises():
+    with pytest.raises(ValueError):
+        Parameters(1.0, 1.0, 'probit')
+
+
+def test_logistic_cdf_within_1e2_above_tail():
+    for i in range(-100, 801):
+        z = i / 100
+        pdf = math.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+        implied_cdf = pdf / mean_scale_at(z, 'logistic')
+        assert abs(implied_cdf - 0.5 * math.erfc(-z / math.sqrt(2))) <= 1e-2, z
+
+
+def test_logistic_keeps_exact_tail():
+    for z in (-1.5, -3.0, -10.0):
+        assert mean_scale_at(z, 'logistic') == mean_scale_at(z)
+
+
+def test_parameters_precompute_squares():
+    parameters = Parameters(2.0, 0.5)
+    assert (parameters.beta_sq, parameters.tau_sq) == (4.0, 0.25)
+    assert parameters == Parameters(2.0, 0.5)
+    assert 'beta_sq' not in repr(parameters)
+
+
+def test_cloned_totality_is_independent():
+    fixed = ConstantRating(True, 1.0, 3.0)
+    original = RateableTotality('t', [SkillBasedRating(25.0, 8.0), fixed])
+    clone = copy.copy(original)
+    assert clone.ratings[1].is_set
+    assert clone.ratings[1] is not fixed
+    clone.ratings[0].mean = 99.0
+    clone.invalidate()
+    assert original.ratings[0].mean == 25.0
+    assert (original.mean, clone.mean) == (28.0, 102.0)
+
+
+def test_clone_keeps_subclass():
+    class Player(SkillBasedRating):
+        pass
+
+    assert type(Player(1.0, 2.0).clone()) is Player
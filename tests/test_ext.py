@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from partial_trueskill import domain
+from partial_trueskill.domain import ConstantRating, Event, Parameters, RateableTotality, SkillBasedRating
+
+pytest.importorskip('partial_trueskill._ext')
+
+SCALARS = ('delta', 'c', 'c_sq', 'z_factor', 'v', 'w')
+
+
+def scalars(event):
+    return tuple(getattr(event, name) for name in SCALARS)
+
+
+@pytest.mark.parametrize('cdf_approx', ['exact', 'logistic'])
+def test_compiled_event_matches_python(monkeypatch, cdf_approx):
+    rng = random.Random(11)
+    parameters = Parameters(4.1, 0.08, cdf_approx)
+    pairs = []
+    for _ in range(5000):
+        winner = SkillBasedRating(rng.uniform(-200, 200), rng.uniform(0.1, 9))
+        loser = RateableTotality('loser', [SkillBasedRating(rng.uniform(-100, 100), rng.uniform(0.1, 9)),
+                                           ConstantRating(True, 1.0, rng.uniform(-5, 5))])
+        pairs.append((winner, loser))
+    compiled = [scalars(Event(1.0, winner, loser, parameters)) for winner, loser in pairs]
+    monkeypatch.setattr(domain, '_compute_event_scalars', None)
+    python = [scalars(Event(1.0, winner, loser, parameters)) for winner, loser in pairs]
+    assert compiled == python
+
+
+def test_zero_c_raises_like_python(monkeypatch):
+    winner, loser = ConstantRating(False, 0.0, 1.0), ConstantRating(False, 0.0, 0.0)
+    with pytest.raises(ZeroDivisionError):
+        Event(1.0, winner, loser, Parameters(1.0, 0.0))
+    monkeypatch.setattr(domain, '_compute_event_scalars', None)
+    with pytest.raises(ZeroDivisionError):
+        Event(1.0, winner, loser, Parameters(1.0, 0.0))